@@ -43,8 +43,9 @@ class SidebarComponent:
         watchlist_tickers = []
         if self.watchlist_service:
             try:
-                watchlist_data = self.watchlist_service.get_watchlist_tickers(active_only=True)
-                watchlist_tickers = [ticker.ticker for ticker in watchlist_data]
+                watchlist_data = self.watchlist_service.get_watchlist_tickers_df(active_only=True)
+                if not watchlist_data.empty:
+                    watchlist_tickers = watchlist_data['ticker'].tolist()
             except Exception as e:
                 # If there's an error getting watchlist, continue with empty list
                 pass
@@ -3,6 +3,7 @@ Configuration settings for the Stock Dashboard application
 """
 
 import os
+from datetime import time
 from pathlib import Path
 
 # Base directory
@@ -15,6 +16,7 @@ DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 # API settings
 DEFAULT_TICKERS = ['AAPL', 'GOOGL', 'AMZN', 'MSFT', 'TSLA', 'NVDA']
 DEFAULT_TIME_PERIODS = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '5y', 'max']
+MAX_FETCH_WORKERS = 16  # Concurrent per-ticker info lookups (yf.download is not thread-safe)
 
 # Chart settings
 CHART_TYPES = ['Candlestick', 'Line']
@@ -34,6 +36,13 @@ INTERVAL_MAPPING = {
 
 # Cache settings
 CACHE_DURATION_MINUTES = 5  # How long to cache stock data
+TICKER_VALIDATION_CACHE_SECONDS = 3600  # How long to reuse a successful ticker lookup
+
+# Regular US trading session; cached data written after the last close stays
+# valid until the next open
+MARKET_TIMEZONE = 'US/Eastern'
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
 
 # UI settings
 CHART_HEIGHT = 600
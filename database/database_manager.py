@@ -3,79 +3,354 @@ Database manager for SQLite operations
 """
 
 import sqlite3
+import threading
+from itertools import chain, repeat
+from operator import itemgetter
+import numpy as np
 import pandas as pd
+import pytz
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from pathlib import Path
 import logging
 
 from .models import StockData, TechnicalIndicators, WatchlistTicker
-from config.settings import DATABASE_PATH, CACHE_DURATION_MINUTES
+from config.settings import (
+    DATABASE_PATH, CACHE_DURATION_MINUTES, MARKET_TIMEZONE, MARKET_OPEN, MARKET_CLOSE
+)
+
+try:
+    # Optional: read stock data as Arrow batches instead of Python row tuples
+    from adbc_driver_sqlite import dbapi as adbc_sqlite
+except ImportError:
+    adbc_sqlite = None
 
 logger = logging.getLogger(__name__)
 
+STOCK_DATA_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS stock_data (
+        ticker TEXT NOT NULL,
+        period TEXT NOT NULL,
+        interval TEXT NOT NULL,
+        datetime TIMESTAMP NOT NULL,
+        open REAL NOT NULL,
+        high REAL NOT NULL,
+        low REAL NOT NULL,
+        close REAL NOT NULL,
+        volume INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (ticker, period, interval, datetime)
+    ) WITHOUT ROWID
+"""
+
+STOCK_DATA_COLUMNS = [
+    'ticker', 'period', 'interval', 'datetime', 'open', 'high', 'low', 'close',
+    'volume', 'created_at'
+]
+
+TECHNICAL_INDICATORS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS technical_indicators (
+        ticker TEXT NOT NULL,
+        datetime TIMESTAMP NOT NULL,
+        sma_20 REAL,
+        sma_50 REAL,
+        sma_100 REAL,
+        sma_200 REAL,
+        ema_20 REAL,
+        rsi_14 REAL,
+        macd REAL,
+        macd_signal REAL,
+        bb_upper REAL,
+        bb_middle REAL,
+        bb_lower REAL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (ticker, datetime)
+    ) WITHOUT ROWID
+"""
+
+# Upserts update conflicting rows in place rather than deleting and
+# re-inserting them; created_at is refreshed since cache freshness keys on it.
+# {rows} takes one or more row placeholders, see _insert_rows
+INSERT_STOCK_DATA_SQL = """
+    INSERT INTO stock_data 
+    (ticker, datetime, open, high, low, close, volume, period, interval)
+    VALUES {rows}
+    ON CONFLICT (ticker, period, interval, datetime) DO UPDATE SET
+        open = excluded.open,
+        high = excluded.high,
+        low = excluded.low,
+        close = excluded.close,
+        volume = excluded.volume,
+        created_at = CURRENT_TIMESTAMP
+"""
+
+INSERT_TECHNICAL_INDICATORS_SQL = """
+    INSERT INTO technical_indicators 
+    (ticker, datetime, sma_20, sma_50, sma_100, sma_200, ema_20, rsi_14, macd, macd_signal,
+     bb_upper, bb_middle, bb_lower)
+    VALUES {rows}
+    ON CONFLICT (ticker, datetime) DO UPDATE SET
+        sma_20 = excluded.sma_20,
+        sma_50 = excluded.sma_50,
+        sma_100 = excluded.sma_100,
+        sma_200 = excluded.sma_200,
+        ema_20 = excluded.ema_20,
+        rsi_14 = excluded.rsi_14,
+        macd = excluded.macd,
+        macd_signal = excluded.macd_signal,
+        bb_upper = excluded.bb_upper,
+        bb_middle = excluded.bb_middle,
+        bb_lower = excluded.bb_lower,
+        created_at = CURRENT_TIMESTAMP
+"""
+
+# Hot read queries, kept as constants so every call reuses one cached
+# prepared statement. With a limit the newest rows are read first and the
+# frame is flipped afterwards
+SELECT_STOCK_DATA_SQL = """
+    SELECT datetime, open, high, low, close, volume
+    FROM stock_data 
+    WHERE ticker = ? AND period = ? AND interval = ?
+"""
+SELECT_STOCK_DATA_ASC_SQL = SELECT_STOCK_DATA_SQL + " ORDER BY datetime ASC"
+SELECT_STOCK_DATA_RECENT_SQL = SELECT_STOCK_DATA_SQL + " ORDER BY datetime DESC LIMIT ?"
+
+SELECT_TECHNICAL_INDICATORS_SQL = """
+    SELECT datetime, sma_20, ema_20, rsi_14, macd, macd_signal, 
+           bb_upper, bb_middle, bb_lower
+    FROM technical_indicators 
+    WHERE ticker = ?
+"""
+SELECT_TECHNICAL_INDICATORS_ASC_SQL = SELECT_TECHNICAL_INDICATORS_SQL + " ORDER BY datetime ASC"
+SELECT_TECHNICAL_INDICATORS_RECENT_SQL = (
+    SELECT_TECHNICAL_INDICATORS_SQL + " ORDER BY datetime DESC LIMIT ?"
+)
+
+# Newest write time for a cached series, answered from idx_stock_data_cache
+CACHE_WRITTEN_AT_SQL = """
+    SELECT MAX(created_at) FROM stock_data 
+    WHERE ticker = ? AND period = ? AND interval = ?
+"""
+
+# Bars of a series older than its current download window, a range on the
+# primary key
+DELETE_STOCK_DATA_BEFORE_SQL = """
+    DELETE FROM stock_data 
+    WHERE ticker = ? AND period = ? AND interval = ? AND datetime < ?
+"""
+
+# Newest cached bar for a series, a single seek on the primary key
+LAST_CACHED_DATETIME_SQL = """
+    SELECT MAX(datetime) FROM stock_data 
+    WHERE ticker = ? AND period = ? AND interval = ?
+"""
+
+# Newest cached indicator row for a ticker, a seek on the primary key
+LAST_INDICATOR_DATETIME_SQL = """
+    SELECT MAX(datetime) FROM technical_indicators WHERE ticker = ?
+"""
+
+SELECT_CACHED_CLOSE_SQL = """
+    SELECT close FROM stock_data 
+    WHERE ticker = ? AND period = ? AND interval = ? AND datetime = ?
+"""
+
+SELECT_COMPANY_NAME_SQL = """
+    SELECT company_name FROM watchlist_tickers 
+    WHERE ticker = ? AND is_active = 1
+"""
+
+STOCK_DATA_ROW = "(?, ?, ?, ?, ?, ?, ?, ?, ?)"
+TECHNICAL_INDICATORS_ROW = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+# Primary key of each table as positions in its insert row tuples,
+# see _insert_rows
+STOCK_DATA_KEY = itemgetter(0, 7, 8, 1)  # ticker, period, interval, datetime
+TECHNICAL_INDICATORS_KEY = itemgetter(0, 1)  # ticker, datetime
+
+# Batches up to this size are written with multi-row VALUES statements, each
+# kept under SQLite's default 999 bound-parameter limit; larger batches use
+# executemany
+MULTI_ROW_INSERT_MAX_ROWS = 500
+SQLITE_MAX_VARIABLES = 999
+
+# DataFrame columns produced by TechnicalIndicatorsService, in the order of
+# the indicator values in INSERT_TECHNICAL_INDICATORS_SQL
+TECHNICAL_INDICATORS_FRAME_COLUMNS = [
+    'SMA_20', 'SMA_50', 'SMA_100', 'SMA_200', 'EMA_20', 'RSI_14', 'MACD',
+    'MACD_Signal', 'BB_Upper', 'BB_Middle', 'BB_Lower'
+]
+
+# Column dtypes for the read paths, in SELECT order
+STOCK_DATA_DTYPES = {
+    'datetime': object,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.int64,
+}
+
+TECHNICAL_INDICATORS_DTYPES = {
+    'datetime': object,
+    'sma_20': np.float64,
+    'ema_20': np.float64,
+    'rsi_14': np.float64,
+    'macd': np.float64,
+    'macd_signal': np.float64,
+    'bb_upper': np.float64,
+    'bb_middle': np.float64,
+    'bb_lower': np.float64,
+}
+
+# Rows pulled from the cursor per fetchmany() call when building DataFrames
+FETCH_CHUNK_SIZE = 10000
+
+TECHNICAL_INDICATORS_COLUMNS = [
+    'ticker', 'datetime', 'sma_20', 'sma_50', 'sma_100', 'sma_200', 'ema_20',
+    'rsi_14', 'macd', 'macd_signal', 'bb_upper', 'bb_middle', 'bb_lower', 'created_at'
+]
+
+# Watchlist columns update_watchlist_ticker may set
+WATCHLIST_UPDATABLE_COLUMNS = frozenset({
+    'notes', 'target_price', 'stop_loss', 'priority', 'is_active', 'updated_at'
+})
+
+# Stored in PRAGMA user_version once _run_migrations has brought a database
+# up to date; bump it when adding a migration
+SCHEMA_VERSION = 2
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    """Parse a stored ISO-8601 timestamp, returning None for empty or invalid values"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _market_is_open(now_utc: datetime) -> bool:
+    """Whether the regular US session is in progress at a naive UTC time"""
+    now_local = pytz.utc.localize(now_utc).astimezone(pytz.timezone(MARKET_TIMEZONE))
+    return now_local.weekday() < 5 and MARKET_OPEN <= now_local.time() < MARKET_CLOSE
+
+
+def _last_market_close(now_utc: datetime) -> datetime:
+    """Most recent weekday session close at or before a naive UTC time, as naive UTC"""
+    market_tz = pytz.timezone(MARKET_TIMEZONE)
+    now_local = pytz.utc.localize(now_utc).astimezone(market_tz)
+    
+    day = now_local.date()
+    if now_local.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    
+    close = market_tz.localize(datetime.combine(day, MARKET_CLOSE))
+    return close.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def _timestamps_to_text(values: pd.Series) -> List[str]:
+    """Render timestamps as naive UTC ISO-8601 text, the format the cache tables store"""
+    # sqlite3 only adapts exact datetime instances, not pandas Timestamps
+    values = pd.to_datetime(values)
+    if values.dt.tz is not None:
+        values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+    return values.dt.strftime('%Y-%m-%d %H:%M:%S').tolist()
+
 
 class DatabaseManager:
     """Manages SQLite database operations for stock data"""
     
+    # Database files already migrated by this process
+    _migrated_paths: set = set()
+    
     def __init__(self, db_path: str = None):
         self.db_path = db_path or DATABASE_PATH
         self._ensure_database_directory()
+        
+        # Single long-lived connection shared by every method; the lock keeps
+        # access serialized since Streamlit sessions run on separate threads
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None,
+            cached_statements=256
+        )
+        self._adbc_conn = None
+        
+        # Watchlist lookups memoized per process; every watchlist mutator
+        # goes through this manager and calls _invalidate_watchlist_cache
+        self._company_name_cache: Dict[str, Optional[str]] = {}
+        self._active_tickers: Optional[set] = None
+        
+        self._configure_connection()
         self._create_tables()
     
     def _ensure_database_directory(self):
         """Ensure the database directory exists"""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
     
+    def _configure_connection(self):
+        """Apply journaling and cache PRAGMAs to the shared connection"""
+        with self._connection() as conn:
+            # Let clear_old_data hand freed pages back to the OS; this only takes
+            # effect on a fresh database, so it has to precede the WAL switch
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            
+            # WAL turns commits into sequential log appends and lets readers
+            # run alongside a writer; NORMAL only syncs at checkpoints in WAL
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA cache_size = -65536")  # 64 MB
+            conn.execute("PRAGMA mmap_size = 268435456")  # 256 MB
+    
+    @contextmanager
+    def _connection(self):
+        """Yield the shared connection while holding the lock"""
+        with self._lock:
+            yield self._conn
+    
+    @contextmanager
+    def _transaction(self, immediate: bool = False):
+        """Yield the shared connection inside an explicit transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # A failed COMMIT (e.g. SQLITE_BUSY) leaves the transaction open
+                # too, and the shared connection could never BEGIN again
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+    
+    def close(self):
+        """Close the shared database connection"""
+        with self._lock:
+            if self._adbc_conn is not None:
+                self._adbc_conn.close()
+                self._adbc_conn = None
+            self._conn.close()
+    
     def _create_tables(self):
         """Create database tables if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
             
-            # Stock data table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS stock_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ticker TEXT NOT NULL,
-                    datetime TIMESTAMP NOT NULL,
-                    open REAL NOT NULL,
-                    high REAL NOT NULL,
-                    low REAL NOT NULL,
-                    close REAL NOT NULL,
-                    volume INTEGER NOT NULL,
-                    period TEXT NOT NULL,
-                    interval TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(ticker, datetime, period, interval)
-                )
-            """)
-            
-            # Technical indicators table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS technical_indicators (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ticker TEXT NOT NULL,
-                    datetime TIMESTAMP NOT NULL,
-                    sma_20 REAL,
-                    sma_50 REAL,
-                    sma_100 REAL,
-                    sma_200 REAL,
-                    ema_20 REAL,
-                    rsi_14 REAL,
-                    macd REAL,
-                    macd_signal REAL,
-                    bb_upper REAL,
-                    bb_middle REAL,
-                    bb_lower REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(ticker, datetime)
-                )
-            """)
+            # Stock data and technical indicators are keyed by their natural
+            # keys; WITHOUT ROWID stores each row once, in primary key order
+            cursor.execute(STOCK_DATA_TABLE_SQL)
+            cursor.execute(TECHNICAL_INDICATORS_TABLE_SQL)
             
             # Watchlist table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS watchlist_tickers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER PRIMARY KEY,
                     ticker TEXT NOT NULL UNIQUE,
                     company_name TEXT NOT NULL,
                     sector TEXT,
@@ -90,15 +365,26 @@ class DatabaseManager:
                 )
             """)
             
+            # Run migrations for existing databases, once per file per process
+            migrate = self.db_path not in DatabaseManager._migrated_paths
+            if migrate:
+                self._run_migrations(cursor)
+            
             # Create indexes for better performance
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_stock_data_ticker_datetime 
-                ON stock_data(ticker, datetime)
+                CREATE INDEX IF NOT EXISTS idx_stock_data_cache 
+                ON stock_data(ticker, period, interval, created_at)
+            """)
+            
+            # Retention deletes in clear_old_data filter on created_at alone
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_stock_data_created_at 
+                ON stock_data(created_at)
             """)
             
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_technical_indicators_ticker_datetime 
-                ON technical_indicators(ticker, datetime)
+                CREATE INDEX IF NOT EXISTS idx_technical_indicators_created_at 
+                ON technical_indicators(created_at)
             """)
             
             cursor.execute("""
@@ -110,41 +396,76 @@ class DatabaseManager:
                 CREATE INDEX IF NOT EXISTS idx_watchlist_active_priority 
                 ON watchlist_tickers(is_active, priority)
             """)
-            
-            conn.commit()
-            
-            # Run migrations for existing databases
-            self._run_migrations()
+        
+        if migrate:
+            DatabaseManager._migrated_paths.add(self.db_path)
+        
+        # Refresh planner statistics so the composite indexes get picked;
+        # analysis_limit keeps this cheap on large databases
+        with self._connection() as conn:
+            conn.execute("PRAGMA analysis_limit = 400")
+            conn.execute("ANALYZE")
     
-    def _run_migrations(self):
-        """Run database migrations for schema updates"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Check if new SMA columns exist, if not add them
-            cursor.execute("PRAGMA table_info(technical_indicators)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            new_columns = ['sma_50', 'sma_100', 'sma_200']
-            for column in new_columns:
-                if column not in columns:
-                    cursor.execute(f"ALTER TABLE technical_indicators ADD COLUMN {column} REAL")
-                    logging.info(f"Added column {column} to technical_indicators table")
-            
-            conn.commit()
+    def _run_migrations(self, cursor: sqlite3.Cursor):
+        """Run database migrations for schema updates inside the caller's transaction"""
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
+        
+        # Check if new SMA columns exist, if not add them
+        cursor.execute("PRAGMA table_info(technical_indicators)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        new_columns = ['sma_50', 'sma_100', 'sma_200']
+        for column in new_columns:
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE technical_indicators ADD COLUMN {column} REAL")
+                logging.info(f"Added column {column} to technical_indicators table")
+        
+        # Rebuild tables still using the old rowid + UNIQUE layout
+        self._rebuild_without_rowid(cursor, 'stock_data', STOCK_DATA_TABLE_SQL, STOCK_DATA_COLUMNS)
+        self._rebuild_without_rowid(
+            cursor, 'technical_indicators', TECHNICAL_INDICATORS_TABLE_SQL, TECHNICAL_INDICATORS_COLUMNS
+        )
+        
+        # Both are now covered by the tables' primary keys
+        cursor.execute("DROP INDEX IF EXISTS idx_stock_data_ticker_datetime")
+        cursor.execute("DROP INDEX IF EXISTS idx_technical_indicators_ticker_datetime")
+        
+        # Normalize watchlist timestamps to the 'YYYY-MM-DD HH:MM:SS[.ffffff]'
+        # text that sqlite3 writes for datetime values and CURRENT_TIMESTAMP
+        for column in ('added_date', 'created_at', 'updated_at'):
+            cursor.execute(f"""
+                UPDATE watchlist_tickers 
+                SET {column} = REPLACE(RTRIM({column}, 'Z'), 'T', ' ')
+                WHERE {column} LIKE '%Z' OR {column} LIKE '%T%'
+            """)
+        
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def _rebuild_without_rowid(self, cursor: sqlite3.Cursor, table: str, create_sql: str,
+                               columns: List[str]):
+        """Copy a legacy table with an 'id' column into its WITHOUT ROWID layout"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if 'id' not in [column[1] for column in cursor.fetchall()]:
+            return
+        
+        column_list = ', '.join(columns)
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+        cursor.execute(create_sql)
+        cursor.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM {table}_legacy
+        """)
+        cursor.execute(f"DROP TABLE {table}_legacy")
+        logging.info(f"Rebuilt {table} table as WITHOUT ROWID")
     
     def save_stock_data(self, stock_data_list: List[StockData]) -> bool:
         """Save stock data to database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for stock_data in stock_data_list:
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO stock_data 
-                        (ticker, datetime, open, high, low, close, volume, period, interval)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
+            with self._transaction() as conn:
+                self._insert_rows(conn.cursor(), INSERT_STOCK_DATA_SQL, STOCK_DATA_ROW, STOCK_DATA_KEY, [
+                    (
                         stock_data.ticker,
                         stock_data.datetime,
                         stock_data.open,
@@ -154,9 +475,63 @@ class DatabaseManager:
                         stock_data.volume,
                         stock_data.period,
                         stock_data.interval
+                    )
+                    for stock_data in stock_data_list
+                ])
+                
+                return True
+                
+        except Exception as e:
+            logger.error(f"Error saving stock data: {e}")
+            return False
+    
+    def save_stock_data_df(self, data: pd.DataFrame, ticker: str, period: str, interval: str,
+                           window_start: Optional[pd.Timestamp] = None) -> bool:
+        """
+        Save OHLCV bars straight from a DataFrame
+        
+        Args:
+            data: DataFrame with Datetime, Open, High, Low, Close and Volume columns
+            ticker: Stock ticker symbol
+            period: Time period the bars were fetched for
+            interval: Data interval of the bars
+            window_start: First bar of the fetched window; cached bars of the
+                series before it are deleted. Defaults to the frame's first bar
+            
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        try:
+            # tolist() hands sqlite3 native Python scalars column by column
+            # instead of building a StockData object per row
+            count = len(data)
+            rows = list(zip(
+                repeat(ticker, count),
+                _timestamps_to_text(data['Datetime']),
+                data['Open'].to_numpy(dtype=np.float64).tolist(),
+                data['High'].to_numpy(dtype=np.float64).tolist(),
+                data['Low'].to_numpy(dtype=np.float64).tolist(),
+                data['Close'].to_numpy(dtype=np.float64).tolist(),
+                data['Volume'].to_numpy(dtype=np.int64).tolist(),
+                repeat(period, count),
+                repeat(interval, count)
+            ))
+            
+            if window_start is None and count:
+                window_start = data['Datetime'].min()
+            
+            with self._transaction() as conn:
+                cursor = conn.cursor()
+                
+                # The cached series mirrors one download window, so earlier
+                # sessions must not linger in reads and metrics
+                if window_start is not None:
+                    cursor.execute(DELETE_STOCK_DATA_BEFORE_SQL, (
+                        ticker, period, interval, _timestamps_to_text(pd.Series([window_start]))[0]
                     ))
                 
-                conn.commit()
+                self._insert_rows(cursor, INSERT_STOCK_DATA_SQL, STOCK_DATA_ROW, STOCK_DATA_KEY, rows)
+                
                 return True
                 
         except Exception as e:
@@ -166,18 +541,16 @@ class DatabaseManager:
     def save_technical_indicators(self, indicators_list: List[TechnicalIndicators]) -> bool:
         """Save technical indicators to database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for indicators in indicators_list:
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO technical_indicators 
-                        (ticker, datetime, sma_20, ema_20, rsi_14, macd, macd_signal, bb_upper, bb_middle, bb_lower)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
+            with self._transaction() as conn:
+                self._insert_rows(conn.cursor(), INSERT_TECHNICAL_INDICATORS_SQL, TECHNICAL_INDICATORS_ROW,
+                                  TECHNICAL_INDICATORS_KEY, [
+                    (
                         indicators.ticker,
                         indicators.datetime,
                         indicators.sma_20,
+                        indicators.sma_50,
+                        indicators.sma_100,
+                        indicators.sma_200,
                         indicators.ema_20,
                         indicators.rsi_14,
                         indicators.macd,
@@ -185,35 +558,96 @@ class DatabaseManager:
                         indicators.bb_upper,
                         indicators.bb_middle,
                         indicators.bb_lower
-                    ))
+                    )
+                    for indicators in indicators_list
+                ])
+                
+                return True
+                
+        except Exception as e:
+            logger.error(f"Error saving technical indicators: {e}")
+            return False
+    
+    def save_technical_indicators_df(self, data: pd.DataFrame, ticker: str) -> bool:
+        """
+        Save technical indicators straight from a DataFrame
+        
+        Args:
+            data: DataFrame with a Datetime column and any of the indicator columns
+            ticker: Stock ticker symbol
+            
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        try:
+            # reindex fills indicators that were not calculated with NaN, and
+            # one mask over the whole block turns every NaN into NULL
+            block = data.reindex(columns=TECHNICAL_INDICATORS_FRAME_COLUMNS)
+            values = block.to_numpy(dtype=object)
+            values[block.isna().to_numpy()] = None
+            
+            rows = list(zip(
+                repeat(ticker, len(data)),
+                _timestamps_to_text(data['Datetime']),
+                *values.T.tolist()
+            ))
+            
+            with self._transaction() as conn:
+                self._insert_rows(
+                    conn.cursor(), INSERT_TECHNICAL_INDICATORS_SQL, TECHNICAL_INDICATORS_ROW,
+                    TECHNICAL_INDICATORS_KEY, rows
+                )
                 
-                conn.commit()
                 return True
                 
         except Exception as e:
             logger.error(f"Error saving technical indicators: {e}")
             return False
     
+    def _insert_rows(self, cursor: sqlite3.Cursor, sql: str, row_placeholder: str,
+                     key: Callable[[tuple], tuple], rows: List[tuple]):
+        """Insert rows with multi-row VALUES statements, or executemany for large batches"""
+        if not rows:
+            return
+        
+        # Insert in primary key order so rows append to neighbouring leaf pages
+        # of the WITHOUT ROWID tables; already ordered batches sort in one pass
+        rows = sorted(rows, key=key)
+        
+        if len(rows) > MULTI_ROW_INSERT_MAX_ROWS:
+            cursor.executemany(sql.format(rows=row_placeholder), rows)
+            return
+        
+        rows_per_statement = SQLITE_MAX_VARIABLES // len(rows[0])
+        for start in range(0, len(rows), rows_per_statement):
+            batch = rows[start:start + rows_per_statement]
+            cursor.execute(
+                sql.format(rows=', '.join([row_placeholder] * len(batch))),
+                list(chain.from_iterable(batch))
+            )
+    
     def get_stock_data(self, ticker: str, period: str, interval: str, 
                       limit: Optional[int] = None) -> pd.DataFrame:
         """Retrieve stock data from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                query = """
-                    SELECT datetime, open, high, low, close, volume
-                    FROM stock_data 
-                    WHERE ticker = ? AND period = ? AND interval = ?
-                    ORDER BY datetime DESC
-                """
-                
+            with self._connection() as conn:
                 if limit:
-                    query += f" LIMIT {limit}"
+                    query = SELECT_STOCK_DATA_RECENT_SQL
+                    params = (ticker, period, interval, int(limit))
+                else:
+                    query = SELECT_STOCK_DATA_ASC_SQL
+                    params = (ticker, period, interval)
                 
-                df = pd.read_sql_query(query, conn, params=(ticker, period, interval))
+                df = None
+                if adbc_sqlite is not None:
+                    df = self._read_frame_arrow(query, params, STOCK_DATA_DTYPES,
+                                                parse_dates=['datetime'])
+                if df is None:
+                    df = self._read_frame(conn, query, params, STOCK_DATA_DTYPES,
+                                          parse_dates=['datetime'])
                 
-                if not df.empty:
-                    df['datetime'] = pd.to_datetime(df['datetime'])
-                    df = df.sort_values('datetime').reset_index(drop=True)
+                if limit and not df.empty:
+                    df = df.iloc[::-1].reset_index(drop=True)
                 
                 return df
                 
@@ -224,23 +658,19 @@ class DatabaseManager:
     def get_technical_indicators(self, ticker: str, limit: Optional[int] = None) -> pd.DataFrame:
         """Retrieve technical indicators from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                query = """
-                    SELECT datetime, sma_20, ema_20, rsi_14, macd, macd_signal, 
-                           bb_upper, bb_middle, bb_lower
-                    FROM technical_indicators 
-                    WHERE ticker = ?
-                    ORDER BY datetime DESC
-                """
-                
+            with self._connection() as conn:
                 if limit:
-                    query += f" LIMIT {limit}"
+                    query = SELECT_TECHNICAL_INDICATORS_RECENT_SQL
+                    params = (ticker, int(limit))
+                else:
+                    query = SELECT_TECHNICAL_INDICATORS_ASC_SQL
+                    params = (ticker,)
                 
-                df = pd.read_sql_query(query, conn, params=(ticker,))
+                df = self._read_frame(conn, query, params, TECHNICAL_INDICATORS_DTYPES,
+                                      parse_dates=['datetime'])
                 
-                if not df.empty:
-                    df['datetime'] = pd.to_datetime(df['datetime'])
-                    df = df.sort_values('datetime').reset_index(drop=True)
+                if limit and not df.empty:
+                    df = df.iloc[::-1].reset_index(drop=True)
                 
                 return df
                 
@@ -248,23 +678,133 @@ class DatabaseManager:
             logger.error(f"Error retrieving technical indicators: {e}")
             return pd.DataFrame()
     
+    def _read_frame(self, conn: sqlite3.Connection, query: str, params: tuple,
+                    dtypes: Dict[str, Any], parse_dates: Optional[List[str]] = None) -> pd.DataFrame:
+        """Stream a query into typed column arrays and build a DataFrame from them"""
+        cursor = conn.execute(query, params)
+        chunks: List[List[np.ndarray]] = [[] for _ in dtypes]
+        
+        while True:
+            rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+            if not rows:
+                break
+            
+            # Transpose the chunk and convert each column straight to its dtype;
+            # NULLs become NaN in float columns
+            for chunk, values, dtype in zip(chunks, zip(*rows), dtypes.values()):
+                chunk.append(np.array(values, dtype=dtype))
+        
+        df = pd.DataFrame({
+            name: self._join_chunks(chunk, dtype)
+            for (name, dtype), chunk in zip(dtypes.items(), chunks)
+        }, copy=False)
+        
+        return self._parse_date_columns(df, parse_dates)
+    
+    def _join_chunks(self, chunk: List[np.ndarray], dtype: Any) -> np.ndarray:
+        """Join per-chunk column arrays, skipping the copy for single-chunk results"""
+        if not chunk:
+            return np.array([], dtype=dtype)
+        if len(chunk) == 1:
+            return chunk[0]
+        return np.concatenate(chunk)
+    
+    def _read_frame_arrow(self, query: str, params: tuple, dtypes: Dict[str, Any],
+                          parse_dates: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Read a query through the ADBC SQLite driver as Arrow record batches
+        
+        The driver infers column types from the first batch, so this is only
+        used for queries without nullable columns. Callers must hold the lock.
+        
+        Returns:
+            DataFrame, or None if the read failed and the sqlite3 path should be used
+        """
+        try:
+            # Autocommit so each read sees the latest writes; otherwise the
+            # driver holds a read transaction open across queries
+            if self._adbc_conn is None:
+                self._adbc_conn = adbc_sqlite.connect(str(self.db_path), autocommit=True)
+            
+            cursor = self._adbc_conn.cursor()
+            try:
+                cursor.execute(query, params)
+                df = cursor.fetch_df()
+            finally:
+                cursor.close()
+            
+            return self._parse_date_columns(df.astype(dtypes), parse_dates)
+            
+        except Exception as e:
+            logger.warning(f"ADBC read failed, falling back to sqlite3: {e}")
+            return None
+    
+    def _parse_date_columns(self, df: pd.DataFrame, parse_dates: Optional[List[str]]) -> pd.DataFrame:
+        """Parse ISO-8601 text timestamp columns with pandas' vectorized parser"""
+        if not df.empty:
+            for column in parse_dates or []:
+                df[column] = pd.to_datetime(df[column], format='ISO8601')
+        return df
+    
+    def get_last_datetime(self, ticker: str, period: str, interval: str) -> Optional[datetime]:
+        """Get the timestamp of the newest cached bar (naive UTC), or None if nothing is cached"""
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(LAST_CACHED_DATETIME_SQL, (ticker, period, interval))
+                return _parse_ts(cursor.fetchone()[0])
+                
+        except Exception as e:
+            logger.error(f"Error getting last cached datetime: {e}")
+            return None
+    
+    def get_last_indicator_datetime(self, ticker: str) -> Optional[datetime]:
+        """Get the timestamp of the newest cached indicator row (naive UTC), or None if there is none"""
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(LAST_INDICATOR_DATETIME_SQL, (ticker,))
+                return _parse_ts(cursor.fetchone()[0])
+                
+        except Exception as e:
+            logger.error(f"Error getting last indicator datetime: {e}")
+            return None
+    
+    def get_cached_close(self, ticker: str, period: str, interval: str,
+                         bar_time: datetime) -> Optional[float]:
+        """Get the cached close of the bar at bar_time (naive UTC), or None if it isn't cached"""
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(SELECT_CACHED_CLOSE_SQL, (
+                    ticker, period, interval, bar_time.strftime('%Y-%m-%d %H:%M:%S')
+                ))
+                row = cursor.fetchone()
+                return row[0] if row else None
+                
+        except Exception as e:
+            logger.error(f"Error getting cached close: {e}")
+            return None
+    
     def is_data_cached(self, ticker: str, period: str, interval: str) -> bool:
         """Check if data is cached and not expired"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
-                # Check if data exists and is recent
-                cutoff_time = datetime.now() - timedelta(minutes=CACHE_DURATION_MINUTES)
+                cursor.execute(CACHE_WRITTEN_AT_SQL, (ticker, period, interval))
+                written_at = _parse_ts(cursor.fetchone()[0])
+                if written_at is None:
+                    return False
                 
-                cursor.execute("""
-                    SELECT COUNT(*) FROM stock_data 
-                    WHERE ticker = ? AND period = ? AND interval = ? 
-                    AND created_at > ?
-                """, (ticker, period, interval, cutoff_time))
+                # created_at is CURRENT_TIMESTAMP, i.e. naive UTC
+                now = datetime.now(pytz.utc).replace(tzinfo=None)
+                if written_at > now - timedelta(minutes=CACHE_DURATION_MINUTES):
+                    return True
                 
-                count = cursor.fetchone()[0]
-                return count > 0
+                # Prices don't move between sessions, so data written after the
+                # last close stays valid until the market reopens
+                return not _market_is_open(now) and written_at >= _last_market_close(now)
                 
         except Exception as e:
             logger.error(f"Error checking cache: {e}")
@@ -273,7 +813,9 @@ class DatabaseManager:
     def clear_old_data(self, days_to_keep: int = 30):
         """Clear old data to keep database size manageable"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            # Take the write lock up front so both deletes commit together
+            # without upgrading from a read lock midway
+            with self._transaction(immediate=True) as conn:
                 cursor = conn.cursor()
                 
                 cutoff_date = datetime.now() - timedelta(days=days_to_keep)
@@ -288,9 +830,13 @@ class DatabaseManager:
                     DELETE FROM technical_indicators WHERE created_at < ?
                 """, (cutoff_date,))
                 
-                conn.commit()
-                
                 logger.info(f"Cleared data older than {days_to_keep} days")
+            
+            # Release a bounded number of freed pages rather than a blocking VACUUM.
+            # executescript steps the pragma to completion; execute() would only
+            # free a single page
+            with self._connection() as conn:
+                conn.executescript("PRAGMA incremental_vacuum(1000);")
                 
         except Exception as e:
             logger.error(f"Error clearing old data: {e}")
@@ -299,7 +845,7 @@ class DatabaseManager:
     def add_watchlist_ticker(self, watchlist_ticker: WatchlistTicker) -> bool:
         """Add a ticker to the watchlist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -321,7 +867,7 @@ class DatabaseManager:
                     watchlist_ticker.updated_at
                 ))
                 
-                conn.commit()
+                self._invalidate_watchlist_cache()
                 return True
                 
         except Exception as e:
@@ -331,61 +877,26 @@ class DatabaseManager:
     def get_watchlist_tickers(self, active_only: bool = True) -> List[WatchlistTicker]:
         """Get all tickers from watchlist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
-                query = """
-                    SELECT ticker, company_name, sector, added_date, notes, 
-                           target_price, stop_loss, is_active, priority, 
-                           created_at, updated_at
-                    FROM watchlist_tickers
-                """
-                
-                if active_only:
-                    query += " WHERE is_active = 1"
-                
-                query += " ORDER BY priority ASC, added_date DESC"
-                
-                cursor.execute(query)
+                cursor.execute(self._watchlist_query(active_only))
                 rows = cursor.fetchall()
                 
                 watchlist_tickers = []
                 for row in rows:
-                    # Convert string dates to datetime objects
-                    added_date = None
-                    created_at = None
-                    updated_at = None
-                    
-                    if row[3]:  # added_date
-                        try:
-                            added_date = datetime.fromisoformat(row[3].replace('Z', '+00:00'))
-                        except (ValueError, AttributeError):
-                            added_date = None
-                    
-                    if row[9]:  # created_at
-                        try:
-                            created_at = datetime.fromisoformat(row[9].replace('Z', '+00:00'))
-                        except (ValueError, AttributeError):
-                            created_at = None
-                    
-                    if row[10]:  # updated_at
-                        try:
-                            updated_at = datetime.fromisoformat(row[10].replace('Z', '+00:00'))
-                        except (ValueError, AttributeError):
-                            updated_at = None
-                    
                     ticker = WatchlistTicker(
                         ticker=row[0],
                         company_name=row[1],
                         sector=row[2],
-                        added_date=added_date,
+                        added_date=_parse_ts(row[3]),
                         notes=row[4],
                         target_price=row[5],
                         stop_loss=row[6],
                         is_active=bool(row[7]),
                         priority=row[8],
-                        created_at=created_at,
-                        updated_at=updated_at
+                        created_at=_parse_ts(row[9]),
+                        updated_at=_parse_ts(row[10])
                     )
                     watchlist_tickers.append(ticker)
                 
@@ -395,19 +906,49 @@ class DatabaseManager:
             logger.error(f"Error getting watchlist tickers: {e}")
             return []
     
+    def get_watchlist_tickers_df(self, active_only: bool = True) -> pd.DataFrame:
+        """Get watchlist tickers as a DataFrame with vectorized timestamp parsing"""
+        try:
+            with self._connection() as conn:
+                iso8601 = {'format': 'ISO8601'}
+                df = pd.read_sql_query(
+                    self._watchlist_query(active_only), conn,
+                    parse_dates={'added_date': iso8601, 'created_at': iso8601, 'updated_at': iso8601}
+                )
+                df['is_active'] = df['is_active'].astype(bool)
+                return df
+                
+        except Exception as e:
+            logger.error(f"Error getting watchlist tickers: {e}")
+            return pd.DataFrame()
+    
+    def _watchlist_query(self, active_only: bool) -> str:
+        """Build the watchlist SELECT shared by the list and DataFrame readers"""
+        query = """
+            SELECT ticker, company_name, sector, added_date, notes, 
+                   target_price, stop_loss, is_active, priority, 
+                   created_at, updated_at
+            FROM watchlist_tickers
+        """
+        
+        if active_only:
+            query += " WHERE is_active = 1"
+        
+        return query + " ORDER BY priority ASC, added_date DESC"
+    
     def is_ticker_in_watchlist(self, ticker: str) -> bool:
         """Check if a ticker is already in the watchlist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT COUNT(*) FROM watchlist_tickers 
-                    WHERE ticker = ? AND is_active = 1
-                """, (ticker,))
+            with self._connection() as conn:
+                # Load the active tickers once and answer from the set until
+                # the watchlist changes
+                if self._active_tickers is None:
+                    cursor = conn.execute(
+                        "SELECT ticker FROM watchlist_tickers WHERE is_active = 1"
+                    )
+                    self._active_tickers = {row[0] for row in cursor.fetchall()}
                 
-                count = cursor.fetchone()[0]
-                return count > 0
+                return ticker in self._active_tickers
                 
         except Exception as e:
             logger.error(f"Error checking if ticker in watchlist: {e}")
@@ -416,17 +957,20 @@ class DatabaseManager:
     def remove_watchlist_ticker(self, ticker: str) -> bool:
         """Remove a ticker from the watchlist (set is_active to False)"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
                     UPDATE watchlist_tickers 
                     SET is_active = 0, updated_at = CURRENT_TIMESTAMP
                     WHERE ticker = ?
+                    RETURNING id
                 """, (ticker,))
                 
-                conn.commit()
-                return cursor.rowcount > 0
+                removed = cursor.fetchone() is not None
+                
+                self._invalidate_watchlist_cache()
+                return removed
                 
         except Exception as e:
             logger.error(f"Error removing watchlist ticker: {e}")
@@ -435,55 +979,58 @@ class DatabaseManager:
     def update_watchlist_ticker(self, ticker: str, **kwargs) -> bool:
         """Update a ticker in the watchlist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
                 # Build dynamic update query
-                set_clauses = []
-                values = []
-                
-                for key, value in kwargs.items():
-                    if key in ['notes', 'target_price', 'stop_loss', 'priority', 'is_active', 'updated_at']:
-                        set_clauses.append(f"{key} = ?")
-                        values.append(value)
+                updates = [(key, value) for key, value in kwargs.items()
+                           if key in WATCHLIST_UPDATABLE_COLUMNS]
                 
-                if not set_clauses:
+                if not updates:
                     return False
                 
-                values.append(ticker)
+                values = [value for _, value in updates] + [ticker]
                 
                 query = f"""
                     UPDATE watchlist_tickers 
-                    SET {', '.join(set_clauses)}
+                    SET {', '.join(f"{key} = ?" for key, _ in updates)}
                     WHERE ticker = ?
+                    RETURNING id
                 """
                 
                 cursor.execute(query, values)
-                conn.commit()
-                return cursor.rowcount > 0
+                updated = cursor.fetchone() is not None
+                
+                self._invalidate_watchlist_cache()
+                return updated
                 
         except Exception as e:
             logger.error(f"Error updating watchlist ticker: {e}")
             return False
     
+    def _invalidate_watchlist_cache(self):
+        """Drop memoized watchlist lookups after the watchlist changes"""
+        with self._lock:
+            self._company_name_cache.clear()
+            self._active_tickers = None
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
-                # Count records in each table
-                cursor.execute("SELECT COUNT(*) FROM stock_data")
-                stock_data_count = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM technical_indicators")
-                indicators_count = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM watchlist_tickers WHERE is_active = 1")
-                watchlist_count = cursor.fetchone()[0]
+                # Count records in each table in a single round trip
+                cursor.execute("""
+                    SELECT (SELECT COUNT(*) FROM stock_data),
+                           (SELECT COUNT(*) FROM technical_indicators),
+                           (SELECT COUNT(*) FROM watchlist_tickers WHERE is_active = 1)
+                """)
+                stock_data_count, indicators_count, watchlist_count = cursor.fetchone()
                 
-                # Get unique tickers
-                cursor.execute("SELECT DISTINCT ticker FROM stock_data")
+                # Get unique tickers; grouping on the leading ticker column is
+                # answered by an index-only scan in key order
+                cursor.execute("SELECT ticker FROM stock_data GROUP BY ticker")
                 tickers = [row[0] for row in cursor.fetchall()]
                 
                 return {
@@ -502,16 +1049,18 @@ class DatabaseManager:
     def get_company_name(self, ticker: str) -> Optional[str]:
         """Get company name for a ticker from the watchlist"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
+                if ticker in self._company_name_cache:
+                    return self._company_name_cache[ticker]
+                
                 cursor = conn.cursor()
                 
-                cursor.execute("""
-                    SELECT company_name FROM watchlist_tickers 
-                    WHERE ticker = ? AND is_active = 1
-                """, (ticker,))
+                cursor.execute(SELECT_COMPANY_NAME_SQL, (ticker,))
                 
                 result = cursor.fetchone()
-                return result[0] if result else None
+                company_name = result[0] if result else None
+                self._company_name_cache[ticker] = company_name
+                return company_name
                 
         except Exception as e:
             logger.error(f"Error getting company name for {ticker}: {e}")
@@ -8,7 +8,7 @@ from typing import Optional
 import pandas as pd
 
 
-@dataclass
+@dataclass(slots=True)
 class StockData:
     """Stock data model"""
     ticker: str
@@ -41,7 +41,7 @@ class StockData:
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class TechnicalIndicators:
     """Technical indicators model"""
     ticker: str
@@ -82,7 +82,7 @@ class TechnicalIndicators:
         return cls(**data)
 
 
-@dataclass
+@dataclass(slots=True)
 class WatchlistTicker:
     """Watchlist ticker model for tracking followed stocks"""
     ticker: str
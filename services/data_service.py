@@ -3,18 +3,25 @@ Data service for fetching and processing stock data
 """
 
 import yfinance as yf
+import numpy as np
 import pandas as pd
+import re
+import math
 from datetime import datetime, timedelta
 import pytz
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from database.database_manager import DatabaseManager
-from database.models import StockData
 from config.settings import INTERVAL_MAPPING, CACHE_DURATION_MINUTES
 
 logger = logging.getLogger(__name__)
 
+# Period strings such as '5d', '1wk', '3mo' or '1y', and the days in each unit
+PERIOD_PATTERN = re.compile(r'^(\d+)(d|wk|mo|y)$')
+PERIOD_UNIT_DAYS = {'d': 1, 'wk': 7, 'mo': 30, 'y': 365}
+MAX_PERIOD_DAYS = 365 * 10  # 10 years for max
+
 
 class DataService:
     """Service for fetching and processing stock data"""
@@ -46,7 +53,7 @@ class DataService:
                 logger.info(f"Using cached data for {ticker}")
                 cached_data = self.db_manager.get_stock_data(ticker, period, interval)
                 if not cached_data.empty:
-                    return cached_data
+                    return self._restore_cached_data(cached_data)
             
             # Fetch fresh data
             logger.info(f"Fetching fresh data for {ticker}")
@@ -63,27 +70,24 @@ class DataService:
             logger.error(f"Error fetching stock data for {ticker}: {e}")
             return None
     
+    def _get_date_range(self, period: str) -> Tuple[datetime, datetime]:
+        """Translate a period string into a (start, end) download window"""
+        end_date = datetime.now()
+        match = PERIOD_PATTERN.match(period)
+        if match:
+            days = int(match[1]) * PERIOD_UNIT_DAYS[match[2]]
+        elif period == 'max':
+            days = MAX_PERIOD_DAYS
+        else:
+            days = 1
+        start_date = end_date - timedelta(days=days)
+        
+        return start_date, end_date
+    
     def _fetch_from_yahoo(self, ticker: str, period: str, interval: str) -> Optional[pd.DataFrame]:
         """Fetch data from Yahoo Finance API"""
         try:
-            end_date = datetime.now()
-            if period == '1wk':
-                start_date = end_date - timedelta(days=7)
-            elif period == 'max':
-                start_date = end_date - timedelta(days=365*10)  # 10 years for max
-            else:
-                # Parse period like '1d', '5d', '1mo', etc.
-                if period.endswith('d'):
-                    days = int(period[:-1])
-                    start_date = end_date - timedelta(days=days)
-                elif period.endswith('mo'):
-                    months = int(period[:-2])
-                    start_date = end_date - timedelta(days=months*30)
-                elif period.endswith('y'):
-                    years = int(period[:-1])
-                    start_date = end_date - timedelta(days=years*365)
-                else:
-                    start_date = end_date - timedelta(days=1)
+            start_date, end_date = self._get_date_range(period)
             
             data = yf.download(ticker, start=start_date, end=end_date, interval=interval)
             
@@ -101,60 +105,149 @@ class DataService:
             logger.error(f"Error fetching from Yahoo Finance: {e}")
             return None
     
+    def _fetch_multi(self, tickers: List[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch several tickers with a single batched Yahoo Finance download
+        
+        Returns:
+            Dict of processed DataFrames keyed by ticker; tickers missing from
+            the response are left out
+        """
+        try:
+            start_date, end_date = self._get_date_range(period)
+            
+            data = yf.download(tickers, start=start_date, end=end_date, interval=interval,
+                               group_by='ticker', threads=True, progress=False)
+            
+            if data.empty:
+                return {}
+            
+            # A single-ticker download comes back with flat OHLCV columns
+            if not isinstance(data.columns, pd.MultiIndex):
+                if len(tickers) != 1:
+                    return {}
+                return {tickers[0]: self._process_data(data)}
+            
+            frames = {}
+            returned = set(data.columns.get_level_values(0))
+            for ticker in tickers:
+                if ticker not in returned:
+                    continue
+                
+                ticker_data = data[ticker].dropna(how='all')
+                if ticker_data.empty:
+                    continue
+                
+                ticker_data.columns.name = None
+                frames[ticker] = self._process_data(ticker_data)
+            
+            return frames
+            
+        except Exception as e:
+            logger.error(f"Error fetching batch from Yahoo Finance: {e}")
+            return {}
+    
     def _flatten_columns(self, data: pd.DataFrame) -> pd.DataFrame:
         """Flatten hierarchical column names from yfinance data"""
         if isinstance(data.columns, pd.MultiIndex):
             data.columns = data.columns.get_level_values(0)
             data.columns.name = None
-            data.index.name = "Date"
         return data
     
     def _process_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """Process and format the data"""
-        # Handle timezone
-        if data.index.tzinfo is None:
-            data.index = data.index.tz_localize('UTC')
-        data.index = data.index.tz_convert('US/Eastern')
+        # Move the index into a Datetime column without copying the price columns
+        data.insert(0, 'Datetime', self._to_market_time(data.index))
+        data.index = pd.RangeIndex(len(data))
+        
+        return data
+    
+    def _to_market_time(self, values) -> pd.DatetimeIndex:
+        """Convert timestamps to US/Eastern, treating naive values as UTC"""
+        # utc=True localizes naive values and converts aware ones in a single pass
+        return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).tz_convert('US/Eastern')
+    
+    def _restore_cached_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Give cached rows the column names and timezone of freshly fetched data"""
+        data = data.rename(columns={
+            'datetime': 'Datetime',
+            'open': 'Open',
+            'high': 'High',
+            'low': 'Low',
+            'close': 'Close',
+            'volume': 'Volume'
+        })
         
-        # Reset index and rename
-        data.reset_index(inplace=True)
-        data.rename(columns={'Date': 'Datetime'}, inplace=True)
+        # The cache stores naive UTC timestamps
+        data['Datetime'] = self._to_market_time(data['Datetime'])
         
         return data
     
     def _save_to_cache(self, data: pd.DataFrame, ticker: str, period: str, interval: str):
         """Save data to database cache"""
         try:
-            stock_data_list = []
-            
-            for _, row in data.iterrows():
-                stock_data = StockData(
-                    ticker=ticker,
-                    datetime=row['Datetime'],
-                    open=float(row['Open']),
-                    high=float(row['High']),
-                    low=float(row['Low']),
-                    close=float(row['Close']),
-                    volume=int(row['Volume']),
-                    period=period,
-                    interval=interval
-                )
-                stock_data_list.append(stock_data)
-            
-            self.db_manager.save_stock_data(stock_data_list)
-            logger.info(f"Cached {len(stock_data_list)} records for {ticker}")
+            # Cached bars from before the fetched window are deleted on save
+            window_start = data['Datetime'].min()
+            
+            # Only write bars from the newest cached one onwards; that bar is
+            # rewritten too since it may have been saved while still forming.
+            # If the bar before it no longer matches the cache, prices were
+            # adjusted and the whole fetched window is rewritten
+            last_cached = self.db_manager.get_last_datetime(ticker, period, interval)
+            if last_cached is not None and data['Datetime'].is_monotonic_increasing:
+                start = data['Datetime'].searchsorted(pd.Timestamp(last_cached, tz='UTC'), side='left')
+                if start > 0 and self._matches_cache(data.iloc[start - 1], ticker, period, interval):
+                    data = data.iloc[start:]
+                    if data.empty:
+                        return
+            
+            if self.db_manager.save_stock_data_df(data, ticker, period, interval, window_start):
+                logger.info(f"Cached {len(data)} records for {ticker}")
             
         except Exception as e:
             logger.error(f"Error saving to cache: {e}")
     
+    def _matches_cache(self, bar: pd.Series, ticker: str, period: str, interval: str) -> bool:
+        """
+        Check a fetched bar against its cached close. yfinance adjusts earlier
+        prices after a split or dividend, so an adjustment since the last save
+        shows up in every bar before the newest cached one
+        """
+        bar_time = bar['Datetime'].tz_convert('UTC').tz_localize(None).to_pydatetime()
+        cached_close = self.db_manager.get_cached_close(ticker, period, interval, bar_time)
+        return cached_close is not None and math.isclose(cached_close, float(bar['Close']), rel_tol=1e-9)
+    
     def get_real_time_prices(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
         """Get real-time prices for multiple tickers using cached data"""
         real_time_data = {}
+        period, interval = '1d', '1m'
+        
+        # Use cached data to avoid API conflicts with main chart, then fetch
+        # every uncached ticker in one batched download
+        frames = {}
+        for ticker in tickers:
+            if self.db_manager.is_data_cached(ticker, period, interval):
+                cached_data = self.db_manager.get_stock_data(ticker, period, interval)
+                if not cached_data.empty:
+                    frames[ticker] = self._restore_cached_data(cached_data)
+        
+        missing = [ticker for ticker in tickers if ticker not in frames]
+        if missing:
+            fetched = self._fetch_multi(missing, period, interval)
+            for ticker, data in fetched.items():
+                self._save_to_cache(data, ticker, period, interval)
+            frames.update(fetched)
+            
+            # Tickers missing from the batched response are retried one by one.
+            # yf.download keeps its results in module globals that every call
+            # resets, so these calls must not overlap
+            for ticker in missing:
+                if ticker not in fetched:
+                    frames[ticker] = self.fetch_stock_data(ticker, period, interval, use_cache=False)
         
         for ticker in tickers:
             try:
-                # Use cached data to avoid API conflicts with main chart
-                data = self.fetch_stock_data(ticker, '1d', '1m', use_cache=True)
+                data = frames.get(ticker)
                 if data is not None and not data.empty:
                     last_price = float(data['Close'].iloc[-1])
                     first_price = float(data['Open'].iloc[0])
@@ -190,13 +283,18 @@ class DataService:
             return {}
         
         try:
-            last_close = float(data['Close'].iloc[-1])
-            prev_close = float(data['Close'].iloc[0])
+            # One float64 block for all four columns; the nan-reductions skip
+            # missing values the way the pandas reductions did
+            columns = data[['High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+            high, low, close, volume = columns.T
+            
+            last_close = float(close[-1])
+            prev_close = float(close[0])
             change = last_close - prev_close
             pct_change = (change / prev_close) * 100
-            high = float(data['High'].max())
-            low = float(data['Low'].min())
-            volume = int(data['Volume'].sum())
+            high = float(np.nanmax(high))
+            low = float(np.nanmin(low))
+            volume = int(np.nansum(volume))
             
             return {
                 'last_close': last_close,
@@ -2,18 +2,61 @@
 Technical indicators service for calculating and managing technical analysis indicators
 """
 
+import numpy as np
 import pandas as pd
-import ta
 import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from database.database_manager import DatabaseManager
-from database.models import TechnicalIndicators
 
 logger = logging.getLogger(__name__)
 
 
+# Indicator formulas follow the ta library's defaults: values stay NaN until a
+# full window is available and EMAs use the recursive (adjust=False) form
+
+# Moving average columns reported by get_indicator_summary, with their keys
+SUMMARY_AVERAGES = {
+    'SMA_20': 'sma_20',
+    'SMA_50': 'sma_50',
+    'SMA_100': 'sma_100',
+    'SMA_200': 'sma_200',
+    'EMA_20': 'ema_20',
+}
+
+
+def _tail_values(data: pd.DataFrame, columns: List[str], rows: int) -> List[Dict[str, float]]:
+    """Read the last rows of the available columns as plain floats, NaN for missing values"""
+    present = [column for column in columns if column in data.columns]
+    values = data[present].tail(rows).to_numpy(dtype=np.float64)
+    return [dict(zip(present, row.tolist())) for row in values]
+
+
+def _or_default(value: float, default: float) -> float:
+    """Replace a NaN value with a default"""
+    return default if np.isnan(value) else value
+
+
+def _sma(close: pd.Series, window: int) -> pd.Series:
+    """Simple moving average"""
+    return close.rolling(window, min_periods=window).mean()
+
+
+def _ema(close: pd.Series, window: int) -> pd.Series:
+    """Exponential moving average with span = window"""
+    return close.ewm(span=window, min_periods=window, adjust=False).mean()
+
+
+def _rsi(close: pd.Series, window: int) -> pd.Series:
+    """Relative Strength Index with Wilder's smoothing (alpha = 1/window)"""
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0.0).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    loss = (-delta.where(delta < 0, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    rsi = 100 - 100 / (1 + gain / loss)
+    return rsi.where(loss != 0, 100.0)
+
+
 class TechnicalIndicatorsService:
     """Service for calculating and managing technical indicators"""
     
@@ -41,31 +84,45 @@ class TechnicalIndicatorsService:
             if indicators is None:
                 indicators = ['SMA_20', 'EMA_20', 'RSI_14', 'MACD', 'BB']
             
-            # Calculate indicators
+            # Calculate indicators, computing each moving average of Close once
+            # so SMA_20 and the Bollinger middle band share one rolling pass
+            close = data['Close']
+            averages = {}
+            
+            def average(kind: str, window: int) -> pd.Series:
+                if (kind, window) not in averages:
+                    average_fn = _sma if kind == 'sma' else _ema
+                    averages[kind, window] = average_fn(close, window)
+                return averages[kind, window]
+            
+            columns = {}
             for indicator in indicators:
                 if indicator == 'SMA_20':
-                    data['SMA_20'] = ta.trend.sma_indicator(data['Close'], window=20)
+                    columns['SMA_20'] = average('sma', 20)
                 elif indicator == 'EMA_20':
-                    data['EMA_20'] = ta.trend.ema_indicator(data['Close'], window=20)
+                    columns['EMA_20'] = average('ema', 20)
                 elif indicator == 'RSI_14':
-                    data['RSI_14'] = ta.momentum.rsi(data['Close'], window=14)
+                    columns['RSI_14'] = _rsi(close, 14)
                 elif indicator == 'MACD':
-                    macd_data = ta.trend.MACD(data['Close'])
-                    data['MACD'] = macd_data.macd()
-                    data['MACD_Signal'] = macd_data.macd_signal()
+                    macd = average('ema', 12) - average('ema', 26)
+                    columns['MACD'] = macd
+                    columns['MACD_Signal'] = _ema(macd, 9)
                 elif indicator == 'BB':
-                    bb_data = ta.volatility.BollingerBands(data['Close'])
-                    data['BB_Upper'] = bb_data.bollinger_hband()
-                    data['BB_Middle'] = bb_data.bollinger_mavg()
-                    data['BB_Lower'] = bb_data.bollinger_lband()
+                    middle = average('sma', 20)
+                    std = close.rolling(20, min_periods=20).std(ddof=0)
+                    columns['BB_Upper'] = middle + 2 * std
+                    columns['BB_Middle'] = middle
+                    columns['BB_Lower'] = middle - 2 * std
                 elif indicator == 'SMA_50':
-                    data['SMA_50'] = ta.trend.sma_indicator(data['Close'], window=50)
+                    columns['SMA_50'] = average('sma', 50)
                 elif indicator == 'SMA_100':
-                    data['SMA_100'] = ta.trend.sma_indicator(data['Close'], window=100)
+                    columns['SMA_100'] = average('sma', 100)
                 elif indicator == 'SMA_200':
-                    data['SMA_200'] = ta.trend.sma_indicator(data['Close'], window=200)
+                    columns['SMA_200'] = average('sma', 200)
                 elif indicator == 'RSI_21':
-                    data['RSI_21'] = ta.momentum.rsi(data['Close'], window=21)
+                    columns['RSI_21'] = _rsi(close, 21)
+            
+            data = data.assign(**columns)
             
             # Save indicators to database
             self._save_indicators_to_cache(data, ticker)
@@ -79,28 +136,18 @@ class TechnicalIndicatorsService:
     def _save_indicators_to_cache(self, data: pd.DataFrame, ticker: str):
         """Save technical indicators to database cache"""
         try:
-            indicators_list = []
-            
-            for _, row in data.iterrows():
-                indicators = TechnicalIndicators(
-                    ticker=ticker,
-                    datetime=row['Datetime'],
-                    sma_20=float(row.get('SMA_20', 0)) if pd.notna(row.get('SMA_20')) else None,
-                    sma_50=float(row.get('SMA_50', 0)) if pd.notna(row.get('SMA_50')) else None,
-                    sma_100=float(row.get('SMA_100', 0)) if pd.notna(row.get('SMA_100')) else None,
-                    sma_200=float(row.get('SMA_200', 0)) if pd.notna(row.get('SMA_200')) else None,
-                    ema_20=float(row.get('EMA_20', 0)) if pd.notna(row.get('EMA_20')) else None,
-                    rsi_14=float(row.get('RSI_14', 0)) if pd.notna(row.get('RSI_14')) else None,
-                    macd=float(row.get('MACD', 0)) if pd.notna(row.get('MACD')) else None,
-                    macd_signal=float(row.get('MACD_Signal', 0)) if pd.notna(row.get('MACD_Signal')) else None,
-                    bb_upper=float(row.get('BB_Upper', 0)) if pd.notna(row.get('BB_Upper')) else None,
-                    bb_middle=float(row.get('BB_Middle', 0)) if pd.notna(row.get('BB_Middle')) else None,
-                    bb_lower=float(row.get('BB_Lower', 0)) if pd.notna(row.get('BB_Lower')) else None
-                )
-                indicators_list.append(indicators)
-            
-            self.db_manager.save_technical_indicators(indicators_list)
-            logger.info(f"Cached {len(indicators_list)} technical indicator records for {ticker}")
+            # Rows before the newest cached one were written by an earlier run,
+            # so only that row (it may have been a forming bar) and the new
+            # tail are written
+            last_cached = self.db_manager.get_last_indicator_datetime(ticker)
+            if last_cached is not None and data['Datetime'].is_monotonic_increasing:
+                start = data['Datetime'].searchsorted(pd.Timestamp(last_cached, tz='UTC'), side='left')
+                data = data.iloc[start:]
+                if data.empty:
+                    return
+            
+            if self.db_manager.save_technical_indicators_df(data, ticker):
+                logger.info(f"Cached {len(data)} technical indicator records for {ticker}")
             
         except Exception as e:
             logger.error(f"Error saving indicators to cache: {e}")
@@ -119,41 +166,39 @@ class TechnicalIndicatorsService:
             return {}
         
         try:
-            latest = data.iloc[-1]
+            # Convert the latest row once instead of boxing each field
+            latest, = _tail_values(data, [
+                *SUMMARY_AVERAGES, 'RSI_14', 'MACD', 'MACD_Signal',
+                'BB_Upper', 'BB_Middle', 'BB_Lower', 'Close'
+            ], 1)
+            nan = float('nan')
             summary = {}
             
             # SMA/EMA
-            if 'SMA_20' in data.columns and pd.notna(latest['SMA_20']):
-                summary['sma_20'] = float(latest['SMA_20'])
-            if 'SMA_50' in data.columns and pd.notna(latest['SMA_50']):
-                summary['sma_50'] = float(latest['SMA_50'])
-            if 'SMA_100' in data.columns and pd.notna(latest['SMA_100']):
-                summary['sma_100'] = float(latest['SMA_100'])
-            if 'SMA_200' in data.columns and pd.notna(latest['SMA_200']):
-                summary['sma_200'] = float(latest['SMA_200'])
-            if 'EMA_20' in data.columns and pd.notna(latest['EMA_20']):
-                summary['ema_20'] = float(latest['EMA_20'])
+            for column, key in SUMMARY_AVERAGES.items():
+                if not np.isnan(latest.get(column, nan)):
+                    summary[key] = latest[column]
             
             # RSI
-            if 'RSI_14' in data.columns and pd.notna(latest['RSI_14']):
-                rsi = float(latest['RSI_14'])
+            if not np.isnan(latest.get('RSI_14', nan)):
+                rsi = latest['RSI_14']
                 summary['rsi_14'] = rsi
                 summary['rsi_signal'] = self._get_rsi_signal(rsi)
             
             # MACD
-            if 'MACD' in data.columns and pd.notna(latest['MACD']):
-                macd = float(latest['MACD'])
-                macd_signal = float(latest.get('MACD_Signal', 0)) if pd.notna(latest.get('MACD_Signal')) else 0
+            if not np.isnan(latest.get('MACD', nan)):
+                macd = latest['MACD']
+                macd_signal = _or_default(latest.get('MACD_Signal', nan), 0)
                 summary['macd'] = macd
                 summary['macd_signal'] = macd_signal
                 summary['macd_histogram'] = macd - macd_signal
             
             # Bollinger Bands
-            if 'BB_Upper' in data.columns and pd.notna(latest['BB_Upper']):
-                bb_upper = float(latest['BB_Upper'])
-                bb_middle = float(latest.get('BB_Middle', 0)) if pd.notna(latest.get('BB_Middle')) else 0
-                bb_lower = float(latest.get('BB_Lower', 0)) if pd.notna(latest.get('BB_Lower')) else 0
-                current_price = float(latest['Close'])
+            if not np.isnan(latest.get('BB_Upper', nan)):
+                bb_upper = latest['BB_Upper']
+                bb_middle = _or_default(latest.get('BB_Middle', nan), 0)
+                bb_lower = _or_default(latest.get('BB_Lower', nan), 0)
+                current_price = latest['Close']
                 
                 summary['bb_upper'] = bb_upper
                 summary['bb_middle'] = bb_middle
@@ -191,13 +236,14 @@ class TechnicalIndicatorsService:
         
         try:
             signals = {}
-            latest = data.iloc[-1]
-            previous = data.iloc[-2]
+            previous, latest = _tail_values(
+                data, ['Close', 'RSI_14', 'MACD', 'MACD_Signal', 'SMA_20', 'EMA_20'], 2
+            )
             
             # RSI signals
-            if 'RSI_14' in data.columns:
-                current_rsi = float(latest['RSI_14']) if pd.notna(latest['RSI_14']) else 50
-                prev_rsi = float(previous['RSI_14']) if pd.notna(previous['RSI_14']) else 50
+            if 'RSI_14' in latest:
+                current_rsi = _or_default(latest['RSI_14'], 50)
+                prev_rsi = _or_default(previous['RSI_14'], 50)
                 
                 if current_rsi < 30 and prev_rsi >= 30:
                     signals['rsi'] = "Buy Signal (Oversold)"
@@ -207,11 +253,11 @@ class TechnicalIndicatorsService:
                     signals['rsi'] = "Hold"
             
             # MACD signals
-            if 'MACD' in data.columns and 'MACD_Signal' in data.columns:
-                current_macd = float(latest['MACD']) if pd.notna(latest['MACD']) else 0
-                current_signal = float(latest['MACD_Signal']) if pd.notna(latest['MACD_Signal']) else 0
-                prev_macd = float(previous['MACD']) if pd.notna(previous['MACD']) else 0
-                prev_signal = float(previous['MACD_Signal']) if pd.notna(previous['MACD_Signal']) else 0
+            if 'MACD' in latest and 'MACD_Signal' in latest:
+                current_macd = _or_default(latest['MACD'], 0)
+                current_signal = _or_default(latest['MACD_Signal'], 0)
+                prev_macd = _or_default(previous['MACD'], 0)
+                prev_signal = _or_default(previous['MACD_Signal'], 0)
                 
                 if current_macd > current_signal and prev_macd <= prev_signal:
                     signals['macd'] = "Buy Signal (MACD Cross Above)"
@@ -221,10 +267,10 @@ class TechnicalIndicatorsService:
                     signals['macd'] = "Hold"
             
             # Moving Average signals
-            if 'SMA_20' in data.columns and 'EMA_20' in data.columns:
-                current_price = float(latest['Close'])
-                sma_20 = float(latest['SMA_20']) if pd.notna(latest['SMA_20']) else current_price
-                ema_20 = float(latest['EMA_20']) if pd.notna(latest['EMA_20']) else current_price
+            if 'SMA_20' in latest and 'EMA_20' in latest:
+                current_price = latest['Close']
+                sma_20 = _or_default(latest['SMA_20'], current_price)
+                ema_20 = _or_default(latest['EMA_20'], current_price)
                 
                 if current_price > sma_20 and current_price > ema_20:
                     signals['ma'] = "Bullish (Price Above MAs)"
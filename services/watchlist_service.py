@@ -4,12 +4,16 @@ Watchlist service for managing followed tickers
 
 import yfinance as yf
 import pandas as pd
+import time
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from database.database_manager import DatabaseManager
 from database.models import WatchlistTicker
+from config.settings import TICKER_VALIDATION_CACHE_SECONDS, MAX_FETCH_WORKERS
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,9 @@ class WatchlistService:
     
     def __init__(self, db_manager: DatabaseManager = None):
         self.db_manager = db_manager or DatabaseManager()
+        
+        # Successful validations keyed by symbol, as (expires_at, result)
+        self._validation_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
     
     def validate_ticker(self, ticker: str) -> Dict[str, Any]:
         """
@@ -40,6 +47,11 @@ class WatchlistService:
                     'error': 'Ticker symbol cannot be empty'
                 }
             
+            # Reuse a recent successful lookup rather than another network call
+            cached = self._validation_cache.get(ticker)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            
             # Try to get ticker info from yfinance
             ticker_obj = yf.Ticker(ticker)
             
@@ -57,13 +69,18 @@ class WatchlistService:
             company_name = info.get('longName', info.get('shortName', ticker))
             sector = info.get('sector', 'Unknown')
             
-            return {
+            result = {
                 'valid': True,
                 'ticker': ticker,
                 'company_name': company_name,
                 'sector': sector,
                 'info': info
             }
+            self._validation_cache[ticker] = (
+                time.monotonic() + TICKER_VALIDATION_CACHE_SECONDS, result
+            )
+            
+            return result
             
         except Exception as e:
             logger.error(f"Error validating ticker {ticker}: {e}")
@@ -72,6 +89,24 @@ class WatchlistService:
                 'error': f'Error validating ticker: {str(e)}'
             }
     
+    def validate_tickers(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Validate several tickers at once, e.g. when importing a watchlist
+        
+        Args:
+            tickers: Stock ticker symbols to validate
+            
+        Returns:
+            Dict of validation results keyed by cleaned ticker symbol
+        """
+        symbols = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers))
+        if not symbols:
+            return {}
+        
+        # Each lookup waits on its own Ticker.info request, so run them side by side
+        with ThreadPoolExecutor(max_workers=min(len(symbols), MAX_FETCH_WORKERS)) as executor:
+            return dict(zip(symbols, executor.map(self.validate_ticker, symbols)))
+    
     def add_ticker_to_watchlist(self, ticker: str, notes: str = None, 
                                target_price: float = None, stop_loss: float = None,
                                priority: int = 3) -> Dict[str, Any]:
@@ -158,6 +193,22 @@ class WatchlistService:
             logger.error(f"Error getting watchlist tickers: {e}")
             return []
     
+    def get_watchlist_tickers_df(self, active_only: bool = True) -> pd.DataFrame:
+        """
+        Get all tickers from watchlist as a DataFrame
+        
+        Args:
+            active_only: If True, only return active tickers
+            
+        Returns:
+            DataFrame with one row per watchlist ticker
+        """
+        try:
+            return self.db_manager.get_watchlist_tickers_df(active_only=active_only)
+        except Exception as e:
+            logger.error(f"Error getting watchlist tickers: {e}")
+            return pd.DataFrame()
+    
     def remove_ticker_from_watchlist(self, ticker: str) -> Dict[str, Any]:
         """
         Remove a ticker from the watchlist
@@ -264,21 +315,14 @@ class WatchlistService:
                     'tickers': []
                 }
             
-            # Count sectors
-            sectors = {}
-            priority_dist = {}
-            
-            for ticker in tickers:
-                sector = ticker.sector or 'Unknown'
-                sectors[sector] = sectors.get(sector, 0) + 1
-                
-                priority = ticker.priority
-                priority_dist[priority] = priority_dist.get(priority, 0) + 1
+            # Count sectors and priorities
+            sectors = Counter(ticker.sector or 'Unknown' for ticker in tickers)
+            priority_dist = Counter(ticker.priority for ticker in tickers)
             
             return {
                 'total_tickers': len(tickers),
-                'sectors': sectors,
-                'priority_distribution': priority_dist,
+                'sectors': dict(sectors),
+                'priority_distribution': dict(priority_dist),
                 'tickers': [ticker.to_dict() for ticker in tickers]
             }
             
@@ -0,0 +1,59 @@
+"""
+Regression tests for the stock data cache holding exactly one download window
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.database_manager import DatabaseManager
+from services.data_service import DataService
+
+
+def make_session(data_service, day, last_close):
+    """Build one processed regular session of 1-minute bars, like a fresh '1d'/'1m' fetch"""
+    index = pd.date_range(f'{day} 14:30', periods=390, freq='min', tz='UTC', name='Date')
+    data = pd.DataFrame({
+        'Open': 100.0,
+        'High': np.linspace(100, last_close, 390) + 1,
+        'Low': np.linspace(100, last_close, 390) - 1,
+        'Close': np.linspace(100, last_close, 390),
+        'Volume': 1000
+    }, index=index)
+    return data_service._process_data(data)
+
+
+def test_consecutive_sessions_keep_one_window(tmp_path):
+    """Saving a second session replaces the first instead of piling up behind it"""
+    data_service = DataService(DatabaseManager(tmp_path / 'cache.db'))
+
+    first = make_session(data_service, '2024-03-04', 150.0)
+    second = make_session(data_service, '2024-03-05', 110.0)
+    data_service._save_to_cache(first, 'TEST', '1d', '1m')
+    data_service._save_to_cache(second, 'TEST', '1d', '1m')
+
+    cached = data_service._restore_cached_data(
+        data_service.db_manager.get_stock_data('TEST', '1d', '1m')
+    )
+
+    assert len(cached) == len(second)
+    assert cached['Datetime'].iloc[0] == second['Datetime'].iloc[0]
+    assert data_service.calculate_basic_metrics(cached) == data_service.calculate_basic_metrics(second)
+
+
+def test_incremental_append_keeps_earlier_bars_of_the_window(tmp_path):
+    """Refetching the same session writes only the tail but keeps the whole window"""
+    data_service = DataService(DatabaseManager(tmp_path / 'cache.db'))
+
+    session = make_session(data_service, '2024-03-05', 110.0)
+    data_service._save_to_cache(session.iloc[:200].copy(), 'TEST', '1d', '1m')
+    data_service._save_to_cache(session.copy(), 'TEST', '1d', '1m')
+
+    cached = data_service.db_manager.get_stock_data('TEST', '1d', '1m')
+
+    assert len(cached) == len(session)
+    np.testing.assert_array_equal(cached['close'].to_numpy(), session['Close'].to_numpy())